@@ -1,14 +1,29 @@
+import os
 import sys
+
+pdf_path = r'd:\work\linkedIn\Glimpse Tech\trail2\Pythom Developer Intern Assignment.pdf'
+# Kept apart from requirements.txt, which lists the pip dependencies
+output_path = 'assignment_requirements.txt'
+
+# The PDF does not change between runs — skip extraction if the output is already up to date
+# (or if it exists and the PDF is not available to compare against)
+if os.path.exists(output_path) and (
+        not os.path.exists(pdf_path) or os.path.getmtime(output_path) >= os.path.getmtime(pdf_path)):
+    print(f"{output_path} is up to date, nothing to extract")
+    sys.exit(0)
+
+if not os.path.exists(pdf_path):
+    print(f"PDF not found: {pdf_path}")
+    sys.exit(1)
+
 try:
-    from pdfminer.high_level import extract_text
+    from pypdf import PdfReader
 except ImportError:
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pdfminer.six"])
-    from pdfminer.high_level import extract_text
+    print("pypdf is required: pip install -r requirements.txt")
+    sys.exit(1)
 
-pdf_path = r'd:\work\linkedIn\Glimpse Tech\trail2\Pythom Developer Intern Assignment.pdf'
-text = extract_text(pdf_path)
-with open('requirements.txt', 'w', encoding='utf-8') as f:
+reader = PdfReader(pdf_path)
+text = "\n".join(page.extract_text() for page in reader.pages)
+with open(output_path, 'w', encoding='utf-8') as f:
     f.write(text)
-print("Extracted text saved to requirements.txt")
-
+print(f"Extracted text saved to {output_path}")
@@ -1,13 +1,47 @@
+import atexit
 import cv2
 import csv
 import os
 import random
+import sys
 from datetime import datetime
-from visual_acuity_engine import VisualAcuityEngine
+from visual_acuity_engine import ORIENTATIONS, VisualAcuityEngine
 
 # Acuity key sequence: '1' = 6/6 (hardest) ... '4' = 6/60 (easiest)
 ACUITY_SEQUENCE = ['1', '2', '3', '4']
 
+# Dedicated generator for trial orientations
+_RNG = random.Random()
+
+# Response keys → orientation. Arrow key codes returned by cv2.waitKeyEx() on Windows:
+# Up=2490368, Down=2621440, Left=2424832, Right=2555904
+KEY_TO_ORIENT = {
+    ord('w'): 'Up',    2490368: 'Up',
+    ord('s'): 'Down',  2621440: 'Down',
+    ord('a'): 'Left',  2424832: 'Left',
+    ord('d'): 'Right', 2555904: 'Right',
+}
+
+# Manual acuity selection keys → acuity key
+KEY_TO_ACUITY = {ord(k): k for k in ACUITY_SEQUENCE}
+
+# Toggle keys (either case) → toggled setting
+TOGGLE_KEYS = {
+    ord(ch): toggle
+    for char, toggle in (('m', 'adaptive'), ('t', 'theme'), ('f', 'fullscreen'),
+                         ('h', 'hud'), ('c', 'chart'))
+    for ch in (char, char.upper())
+}
+
+# Buffer size for the response log (rows are flushed on exit instead of per keypress)
+LOG_BUFFER_SIZE = 64 * 1024
+
+# Response rows held in memory before they are written out with one writerows call
+LOG_BATCH_SIZE = 256
+
+# Per-keypress console output; set VAE_VERBOSE=0 to silence it for scripted/stress runs
+VERBOSE = os.environ.get("VAE_VERBOSE", "1") == "1"
+
 
 def step_acuity(current_key, direction):
     """
@@ -24,13 +58,25 @@ def step_acuity(current_key, direction):
     return ACUITY_SEQUENCE[idx]
 
 
+def flush_log(log_fh, log_writer, rows):
+    """
+    Write all pending response rows with a single writerows call, clear the
+    batch and flush the file. No-op when nothing is pending.
+    """
+    if not rows:
+        return
+    log_writer.writerows(rows)
+    rows.clear()
+    log_fh.flush()
+
+
 def main():
     # Initialize Engine
     engine = VisualAcuityEngine(viewing_distance_mm=100.0, display_ppi=300.0, resolution=(800, 600))
 
     # State
     current_acuity_key = '2'            # Start at 6/12 (mid-range)
-    current_orientation = random.choice(['Up', 'Down', 'Left', 'Right'])
+    current_orientation = _RNG.choice(ORIENTATIONS)
     adaptive_mode = True                # Toggle with 'M'
     dark_mode = False                   # Toggle with 'T' (starts light)
     fullscreen = False                  # Toggle with 'F'
@@ -43,132 +89,174 @@ def main():
     cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
     cv2.resizeWindow(window_name, 800, 600)
 
-    # CSV Setup
+    # CSV Setup — the log stays open for the whole session behind one buffered writer
     file_exists = os.path.isfile(log_file)
-    with open(log_file, 'a', newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow([
-                'Timestamp', 'Acuity Level', 'True Orientation',
-                'User Response', 'Result', 'Mode'
-            ])
+    log_fh = open(log_file, 'a', newline='', buffering=LOG_BUFFER_SIZE)
+    atexit.register(log_fh.close)
+    log_writer = csv.writer(log_fh)
+    log_rows = []
+    # Registered after close, so atexit runs it first
+    atexit.register(flush_log, log_fh, log_writer, log_rows)
+    if not file_exists:
+        log_writer.writerow([
+            'Timestamp', 'Acuity Level', 'True Orientation',
+            'User Response', 'Result', 'Mode'
+        ])
 
     print("Engine Started.")
     print("Keys: 1-4 (Acuity), W/A/S/D (Respond), M (Adaptive), T (Theme), F (Fullscreen), ESC (Exit)")
     print(f"Adaptive Mode: {'ON' if adaptive_mode else 'OFF'} | Theme: {'Dark' if dark_mode else 'Light'}")
 
-    while True:
-        # Render
-        if chart_mode:
-            canvas = engine.render_chart_mode(dark_mode, hide_hud)
-            warning = None
-        else:
-            canvas, warning = engine.render_landolt_c(
-                current_acuity_key, current_orientation, adaptive_mode, dark_mode, hide_hud
-            )
-        if warning:
-            print(warning)
-
-        cv2.imshow(window_name, canvas)
-
-        # waitKeyEx returns full extended keycodes — needed for arrow keys on Windows
-        key = cv2.waitKeyEx(0)
-
-        # Exit on ESC
-        if key == 27:
+    running = True
+    dirty = True                        # Set whenever a key changes what is on screen
+    while running:
+        # Render (skipped when the processed keys changed nothing visible)
+        if dirty:
+            if chart_mode:
+                canvas = engine.render_chart_mode(dark_mode, hide_hud)
+                warning = None
+            else:
+                canvas, warning = engine.render_landolt_c(
+                    current_acuity_key, current_orientation, adaptive_mode, dark_mode, hide_hud
+                )
+            if warning and VERBOSE:
+                print(warning)
+
+            cv2.imshow(window_name, canvas)
+            # Only the single-optotype view shows the stimulus that responses are scored against
+            stimulus_shown = not chart_mode
+            dirty = False
+
+        # waitKeyEx returns full extended keycodes — needed for arrow keys on Windows.
+        # Block for the first key, then drain everything queued behind it so a burst
+        # of keys is handled in one pass and only the final state gets rendered.
+        keys = [cv2.waitKeyEx(0)]
+
+        # Without a window (closed from its title bar) the blocking wait returns -1 at
+        # once; end the session the same way ESC does so pending log rows are flushed
+        if keys[0] == -1 or cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE) < 1:
             break
 
-        # Toggle adaptive mode with 'M'
-        if key == ord('m') or key == ord('M'):
-            adaptive_mode = not adaptive_mode
-            print(f"Adaptive Mode: {'ON' if adaptive_mode else 'OFF'}")
-            continue
-
-        # Toggle theme with 'T'
-        if key == ord('t') or key == ord('T'):
-            dark_mode = not dark_mode
-            print(f"Theme: {'Dark' if dark_mode else 'Light'}")
-            continue
-
-        # Toggle fullscreen with 'F'
-        if key == ord('f') or key == ord('F'):
-            fullscreen = not fullscreen
-            if fullscreen:
-                cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-            else:
-                cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
-                cv2.resizeWindow(window_name, 800, 600)
-            print(f"Fullscreen: {'ON' if fullscreen else 'OFF'}")
-            continue
-
-        # Toggle HUD visibility with 'H'
-        if key == ord('h') or key == ord('H'):
-            hide_hud = not hide_hud
-            print(f"HUD: {'Hidden' if hide_hud else 'Visible'}")
-            continue
-
-        # Toggle Chart Mode with 'C'
-        if key == ord('c') or key == ord('C'):
-            chart_mode = not chart_mode
-            print(f"Chart Mode: {'ON' if chart_mode else 'OFF'}")
-            continue
-
-        # Manual acuity switching (disables adaptive for that pick)
-        if ord('1') <= key <= ord('4'):
-            current_acuity_key = chr(key)
-            current_orientation = random.choice(['Up', 'Down', 'Left', 'Right'])
-            print(f"Manual override → {engine.acuity_levels[current_acuity_key][0]}")
-            continue
-
-        # Response handling — WASD and Arrow keys
-        if chart_mode:
-             # In chart mode, we don't log individual responses as there are multiple optotypes
-             continue
-
-        user_response = None
-        # Arrow key codes returned by cv2.waitKeyEx() on Windows:
-        # Up=2490368, Down=2621440, Left=2424832, Right=2555904
-        if   key == ord('w') or key == 2490368: user_response = 'Up'
-        elif key == ord('s') or key == 2621440: user_response = 'Down'
-        elif key == ord('a') or key == 2424832: user_response = 'Left'
-        elif key == ord('d') or key == 2555904: user_response = 'Right'
-
-        if user_response:
-            result = "Correct" if user_response == current_orientation else "Incorrect"
-            acuity_name = engine.acuity_levels[current_acuity_key][0]
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            mode_label = "Adaptive" if adaptive_mode else "Manual"
-
-            # Log to CSV
-            with open(log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
+        while True:
+            key = cv2.waitKeyEx(1)
+            if key == -1:
+                break
+            keys.append(key)
+
+        for key in keys:
+            # Exit on ESC
+            if key == 27:
+                running = False
+                break
+
+            toggle = TOGGLE_KEYS.get(key)
+
+            # Toggle adaptive mode with 'M'
+            if toggle == 'adaptive':
+                adaptive_mode = not adaptive_mode
+                dirty = True
+                if VERBOSE:
+                    sys.stdout.write(f"Adaptive Mode: {'ON' if adaptive_mode else 'OFF'}\n")
+                continue
+
+            # Toggle theme with 'T'
+            if toggle == 'theme':
+                dark_mode = not dark_mode
+                dirty = True
+                if VERBOSE:
+                    sys.stdout.write(f"Theme: {'Dark' if dark_mode else 'Light'}\n")
+                continue
+
+            # Toggle fullscreen with 'F'
+            if toggle == 'fullscreen':
+                fullscreen = not fullscreen
+                if fullscreen:
+                    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+                else:
+                    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+                    cv2.resizeWindow(window_name, 800, 600)
+                if VERBOSE:
+                    sys.stdout.write(f"Fullscreen: {'ON' if fullscreen else 'OFF'}\n")
+                continue
+
+            # Toggle HUD visibility with 'H'
+            if toggle == 'hud':
+                hide_hud = not hide_hud
+                dirty = True
+                if VERBOSE:
+                    sys.stdout.write(f"HUD: {'Hidden' if hide_hud else 'Visible'}\n")
+                continue
+
+            # Toggle Chart Mode with 'C'
+            if toggle == 'chart':
+                chart_mode = not chart_mode
+                dirty = True
+                if VERBOSE:
+                    sys.stdout.write(f"Chart Mode: {'ON' if chart_mode else 'OFF'}\n")
+                continue
+
+            # Manual acuity switching (disables adaptive for that pick)
+            if key in KEY_TO_ACUITY:
+                current_acuity_key = KEY_TO_ACUITY[key]
+                current_orientation = _RNG.choice(ORIENTATIONS)
+                stimulus_shown = False
+                dirty = True
+                if VERBOSE:
+                    sys.stdout.write(f"Manual override → {engine.acuity_levels[current_acuity_key][0]}\n")
+                continue
+
+            # Response handling — WASD and Arrow keys
+            if chart_mode:
+                 # In chart mode, we don't log individual responses as there are multiple optotypes
+                 continue
+
+            user_response = KEY_TO_ORIENT.get(key)
+
+            # A queued response whose stimulus was never displayed (an earlier key in the
+            # same burst already changed it) is dropped rather than scored
+            if user_response and stimulus_shown:
+                result = "Correct" if user_response == current_orientation else "Incorrect"
+                acuity_name = engine.acuity_levels[current_acuity_key][0]
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                mode_label = "Adaptive" if adaptive_mode else "Manual"
+
+                # Log to CSV (batched; written every LOG_BATCH_SIZE rows and on exit)
+                log_rows.append([
                     timestamp, acuity_name, current_orientation,
                     user_response, result, mode_label
                 ])
+                if len(log_rows) >= LOG_BATCH_SIZE:
+                    flush_log(log_fh, log_writer, log_rows)
 
-            print(f"[{mode_label}] {acuity_name} | True: {current_orientation} | "
-                  f"User: {user_response} | {result}")
+                if VERBOSE:
+                    print(f"[{mode_label}] {acuity_name} | True: {current_orientation} | "
+                          f"User: {user_response} | {result}")
 
-            # Adaptive stepping
-            if adaptive_mode:
-                if result == "Correct":
-                    new_key = step_acuity(current_acuity_key, 'harder')
-                    if new_key != current_acuity_key:
-                        print(f"  → Stepping HARDER: {engine.acuity_levels[new_key][0]}")
-                    else:
-                        print(f"  → Already at hardest level (6/6).")
-                else:
-                    new_key = step_acuity(current_acuity_key, 'easier')
-                    if new_key != current_acuity_key:
-                        print(f"  → Stepping EASIER: {engine.acuity_levels[new_key][0]}")
+                # Adaptive stepping
+                if adaptive_mode:
+                    if result == "Correct":
+                        new_key = step_acuity(current_acuity_key, 'harder')
+                        if VERBOSE:
+                            if new_key != current_acuity_key:
+                                print(f"  → Stepping HARDER: {engine.acuity_levels[new_key][0]}")
+                            else:
+                                print("  → Already at hardest level (6/6).")
                     else:
-                        print(f"  → Already at easiest level (6/60).")
-                current_acuity_key = new_key
+                        new_key = step_acuity(current_acuity_key, 'easier')
+                        if VERBOSE:
+                            if new_key != current_acuity_key:
+                                print(f"  → Stepping EASIER: {engine.acuity_levels[new_key][0]}")
+                            else:
+                                print("  → Already at easiest level (6/60).")
+                    current_acuity_key = new_key
 
-            # Randomize orientation for next trial
-            current_orientation = random.choice(['Up', 'Down', 'Left', 'Right'])
+                # Randomize orientation for next trial
+                current_orientation = _RNG.choice(ORIENTATIONS)
+                stimulus_shown = False
+                dirty = True
 
+    flush_log(log_fh, log_writer, log_rows)
+    log_fh.flush()
     cv2.destroyAllWindows()
 
 
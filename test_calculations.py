@@ -7,9 +7,35 @@ def test_calculations():
     print(f"{'Acuity':<10} | {'Angle (min)':<12} | {'Gap (px)':<10} | {'Height (px)':<12}")
     print("-" * 55)
     
-    for key, (name, arcmin) in engine.acuity_levels.items():
-        gap_px, height_px = engine.calculate_sizes_px(arcmin)
+    all_sizes = engine.calculate_all_sizes_px()
+    for (key, (name, arcmin)), (gap_px, height_px) in zip(engine.acuity_levels.items(), all_sizes):
         print(f"{name:<10} | {arcmin:<12.1f} | {gap_px:<10.3f} | {height_px:<12.3f}")
 
+        # Vectorized sizes must agree with the scalar path
+        expected_gap, expected_height = engine.calculate_sizes_px(arcmin)
+        assert math.isclose(gap_px, expected_gap) and math.isclose(height_px, expected_height)
+
+        # The small-angle shortcut stays well below a pixel of the exact tan() result
+        approx_gap, approx_height = engine.calculate_sizes_px(arcmin, small_angle=True)
+        assert abs(approx_gap - gap_px) < 1e-4 and abs(approx_height - height_px) < 1e-4
+
+def test_calibration_change():
+    engine = VisualAcuityEngine(viewing_distance_mm=100.0, display_ppi=300.0)
+    engine.render_landolt_c('4', 'Right')
+
+    # Changing distance and PPI after construction must reach every size helper and the geometry
+    engine.display_ppi = 600.0
+    engine.viewing_distance_mm = 200.0
+    fresh = VisualAcuityEngine(viewing_distance_mm=200.0, display_ppi=600.0)
+
+    assert math.isclose(engine.mm_to_pixels(25.4), 600.0)
+    assert engine.calculate_sizes_px(10.0) == fresh.calculate_sizes_px(10.0)
+    assert engine.calculate_sizes_px(10.0, small_angle=True) == fresh.calculate_sizes_px(10.0, small_angle=True)
+
+    canvas, _ = engine.render_landolt_c('4', 'Right')
+    expected, _ = fresh.render_landolt_c('4', 'Right')
+    assert (canvas == expected).all()
+
 if __name__ == "__main__":
     test_calculations()
+    test_calibration_change()
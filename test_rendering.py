@@ -0,0 +1,46 @@
+import visual_acuity_engine
+from visual_acuity_engine import ORIENTATIONS, VisualAcuityEngine
+
+# Y position of each acuity row in chart mode
+CHART_ROWS = {'4': 150, '3': 280, '2': 380, '1': 460}
+
+class _FixedOrientation:
+    """Stands in for the chart's RNG so every optotype gets the same orientation."""
+    def __init__(self, orientation):
+        self.orientation = orientation
+
+    def choices(self, population, k=1):
+        return [self.orientation] * k
+
+def _inked(canvas, bg_color):
+    return int((canvas != bg_color).any(axis=2).sum())
+
+def test_single_optotype_visible():
+    engine = VisualAcuityEngine()
+    for key, (name, _) in engine.acuity_levels.items():
+        for orientation in ORIENTATIONS:
+            for dark_mode, bg_color in ((False, 255), (True, 0)):
+                canvas, _ = engine.render_landolt_c(key, orientation, dark_mode=dark_mode, hide_hud=True)
+                inked = _inked(canvas, bg_color)
+                print(f"{name:<6} {orientation:<6} dark={dark_mode!s:<5} {inked} px")
+                assert inked > 0, f"{name} {orientation} rendered blank"
+
+def test_chart_optotypes_visible():
+    engine = VisualAcuityEngine()
+    rng = visual_acuity_engine._RNG
+    try:
+        for orientation in ORIENTATIONS:
+            visual_acuity_engine._RNG = _FixedOrientation(orientation)
+            for dark_mode, bg_color in ((False, 255), (True, 0)):
+                canvas = engine.render_chart_mode(dark_mode=dark_mode, hide_hud=True)
+                for key, y_pos in CHART_ROWS.items():
+                    name = engine.acuity_levels[key][0]
+                    inked = _inked(canvas[y_pos - 20:y_pos + 20], bg_color)
+                    print(f"chart {name:<6} {orientation:<6} dark={dark_mode!s:<5} {inked} px")
+                    assert inked > 0, f"chart row {name} ({orientation}) rendered blank"
+    finally:
+        visual_acuity_engine._RNG = rng
+
+if __name__ == "__main__":
+    test_single_optotype_visible()
+    test_chart_optotypes_visible()
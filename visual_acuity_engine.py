@@ -1,15 +1,70 @@
 import numpy as np
 import cv2
 import math
+import random
+from collections import namedtuple
+
+# Unit conversions
+ARCMIN_TO_RAD = math.pi / (180.0 * 60.0)
+MM_PER_INCH = 25.4
+
+# Gap orientations, and the generator used to randomize them
+ORIENTATIONS = ('Up', 'Down', 'Left', 'Right')
+_RNG = random.Random()
+
+# Below this ring width (outer minus hole radius, px) circles are drawn with
+# cv2.LINE_AA: a LINE_8 hole the size of the ring would leave nothing visible
+MIN_CRISP_RING_PX = 2
+
+# Integer draw geometry of one acuity level, computed once per resolution.
+# warning is the size-constraint message for that level (None if unclamped).
+LandoltGeometry = namedtuple('LandoltGeometry', ['outer_radius', 'inner_radius', 'stroke', 'warning'])
+
+# Gap rotation angle (degrees) per orientation: 0: Right, 90: Down, 180: Left, 270: Up
+GAP_ANGLES = {
+    'Right': 0,
+    'Down': 90,
+    'Left': 180,
+    'Up': 270
+}
+
+# Transposed rotation matrices for every orientation, stacked as (N, 2, 2) in
+# GAP_ANGLES order so all gap polygons of one acuity rotate in a single matmul
+GAP_ROTATIONS_T = np.array([
+    [[math.cos(math.radians(angle)), math.sin(math.radians(angle))],
+     [-math.sin(math.radians(angle)), math.cos(math.radians(angle))]]
+    for angle in GAP_ANGLES.values()
+])
+
+# Transposed rotation matrices used by the chart renderer (Up is -90 there)
+CHART_GAP_ROTATIONS_T = {
+    orientation: np.array(((np.cos(theta), -np.sin(theta)), (np.sin(theta), np.cos(theta)))).T
+    for orientation, theta in (
+        ('Up', np.radians(-90)),
+        ('Down', np.radians(90)),
+        ('Left', np.radians(180)),
+        ('Right', np.radians(0))
+    )
+}
 
 class VisualAcuityEngine:
     """
     Core engine for calculating stimulus sizes and rendering Landolt C optotypes.
     """
+    __slots__ = (
+        '_viewing_distance_mm', '_display_ppi', 'resolution', 'acuity_levels',
+        '_px_per_mm', '_arcmin_to_px_small',
+        '_frame_cache', '_frame_cache_params', '_geom', '_gap_polys', '_gap_rects', '_center',
+        '_blank_light', '_blank_dark'
+    )
+
     def __init__(self, viewing_distance_mm=100.0, display_ppi=300.0, resolution=(800, 600)):
-        self.viewing_distance_mm = viewing_distance_mm
-        self.display_ppi = display_ppi
+        self._viewing_distance_mm = viewing_distance_mm
+        self._display_ppi = display_ppi
         self.resolution = resolution  # (width, height)
+
+        # Conversion factors hoisted out of the size helpers
+        self._update_conversion_factors()
         
         # Visual Acuity Levels: (Name, Gap Angle in arc minutes)
         self.acuity_levels = {
@@ -19,9 +74,48 @@ class VisualAcuityEngine:
             '4': ('6/60', 10.0)
         }
 
+        # Rendered single-optotype frames keyed by their full visual state.
+        # Only 4 acuities x 4 orientations x 2^3 flags exist, so every frame
+        # is drawn once and reused on later keypresses.
+        self._frame_cache = {}
+        self._frame_cache_params = self._render_params()
+
+        # Per-acuity geometry and gap polygons depend only on the fixed acuity
+        # levels, resolution, distance and PPI, so they are computed once up front.
+        self._precompute_geometry()
+        self._allocate_canvases()
+
+    @property
+    def viewing_distance_mm(self):
+        return self._viewing_distance_mm
+
+    @viewing_distance_mm.setter
+    def viewing_distance_mm(self, value):
+        self._viewing_distance_mm = value
+        self._update_conversion_factors()
+
+    @property
+    def display_ppi(self):
+        return self._display_ppi
+
+    @display_ppi.setter
+    def display_ppi(self, value):
+        self._display_ppi = value
+        self._update_conversion_factors()
+
+    def _update_conversion_factors(self):
+        """Recompute the cached px/mm and small-angle arcmin -> px factors from distance and PPI."""
+        self._px_per_mm = self._display_ppi / MM_PER_INCH
+        # Small-angle (tan(x) ~ x) arcmin -> px factor; at 10 arcmin it is ~1e-5 px off the tan() value
+        self._arcmin_to_px_small = self._viewing_distance_mm * ARCMIN_TO_RAD * self._px_per_mm
+
+    def _render_params(self):
+        """Everything the precomputed geometry and cached frames depend on besides the acuity levels."""
+        return (tuple(self.resolution), self._viewing_distance_mm, self._display_ppi)
+
     def arcmin_to_rad(self, arcmin):
         """Convert arc minutes to radians."""
-        return arcmin * (math.pi / (180.0 * 60.0))
+        return arcmin * ARCMIN_TO_RAD
 
     def visual_angle_to_mm(self, angle_rad):
         """Convert visual angle (radians) to physical size (mm) using tan(theta)."""
@@ -31,15 +125,19 @@ class VisualAcuityEngine:
     def mm_to_pixels(self, size_mm):
         """Convert physical size (mm) to pixels based on display PPI."""
         # 1 inch = 25.4 mm
-        return size_mm * (self.display_ppi / 25.4)
+        return size_mm * self._px_per_mm
 
-    def calculate_sizes_px(self, arcmin):
+    def calculate_sizes_px(self, arcmin, small_angle=False):
         """
         Calculate gap size and total letter height in pixels for a given arc minute angle.
+        small_angle: If True, use tan(theta) ~ theta (a single multiply) instead of the exact tan.
         """
-        angle_rad = self.arcmin_to_rad(arcmin)
-        gap_mm = self.visual_angle_to_mm(angle_rad)
-        gap_px = self.mm_to_pixels(gap_mm)
+        if small_angle:
+            gap_px = arcmin * self._arcmin_to_px_small
+            return gap_px, 5 * gap_px
+
+        # Exact tan(theta) as specified in requirements (helpers above inlined)
+        gap_px = self.viewing_distance_mm * math.tan(arcmin * ARCMIN_TO_RAD) * self._px_per_mm
         
         # Total height = 5 * gap size
         # Stroke width = gap size
@@ -47,6 +145,104 @@ class VisualAcuityEngine:
         
         return gap_px, height_px
 
+    def calculate_all_sizes_px(self):
+        """
+        Vectorized calculate_sizes_px over every acuity level.
+        Returns an (N, 2) array of (gap_px, height_px) rows in acuity_levels order.
+        """
+        arcmins = np.fromiter((v[1] for v in self.acuity_levels.values()), dtype=np.float64)
+        angles = arcmins * ARCMIN_TO_RAD
+        gaps_mm = self.viewing_distance_mm * np.tan(angles)
+        gaps_px = gaps_mm * self._px_per_mm
+        return np.stack([gaps_px, 5 * gaps_px], axis=1)
+
+    def _precompute_geometry(self):
+        """
+        Precompute the clamped Landolt C geometry for every acuity level.
+        Fills self._geom[key] with a LandoltGeometry of integer radii/stroke and the
+        size warning, self._center with the canvas center, self._gap_rects with slice
+        bounds for axis-aligned gaps, and self._gap_polys[(key, orientation)] with the rotated int32 gap polygon.
+        """
+        self._geom = {}
+        self._gap_polys = {}
+        self._gap_rects = {}
+
+        # Center coordinates
+        center_x, center_y = self.resolution[0] // 2, self.resolution[1] // 2
+        self._center = (center_x, center_y)
+
+        all_sizes = self.calculate_all_sizes_px()
+        for (key, (name, _)), (gap_px, height_px) in zip(self.acuity_levels.items(), all_sizes.tolist()):
+            # Constraints check
+            warning = None
+            if height_px > min(self.resolution):
+                # Scale down proportionally if it exceeds screen
+                scale = min(self.resolution) / height_px
+                height_px = min(self.resolution)
+                gap_px = gap_px * scale
+                warning = f"Warning: {name} stimulus exceeds screen size, scaled down."
+
+            if height_px < 2.0:
+                scale = 2.0 / height_px
+                height_px = 2.0
+                gap_px = gap_px * scale
+                warning = f"Warning: {name} stimulus size very small (calculated height {2.0 / scale:.2f}px < 2px), using minimum visible size."
+
+            # Outer radius = height_px / 2
+            # Inner radius = (height_px - 2 * stroke) / 2 = (5g - 2g) / 2 = 3g / 2
+            outer_radius = int(round(height_px / 2))
+            inner_radius = int(round(3 * gap_px / 2))
+            stroke = int(round(gap_px))
+            self._geom[key] = LandoltGeometry(outer_radius, inner_radius, stroke, warning)
+
+            # The gap is a rectangle of width 'stroke' that extends from the
+            # center to just past the outer edge, rotated per orientation
+            gap_rect_width = stroke
+            gap_rect_height = outer_radius + 5 # Extra for overlap
+            pts = np.array([
+                [0, -gap_rect_width / 2],
+                [gap_rect_height, -gap_rect_width / 2],
+                [gap_rect_height, gap_rect_width / 2],
+                [0, gap_rect_width / 2]
+            ])
+
+            # Rotate for all orientations at once: (N, 4, 2) int32 pixel coordinates
+            rotated_pts = (pts @ GAP_ROTATIONS_T + [center_x, center_y]).astype(np.int32)
+            for orientation, poly in zip(GAP_ANGLES, rotated_pts):
+                self._gap_polys[(key, orientation)] = poly
+
+                # An axis-aligned gap is a plain rectangle: keep its (inclusive) bounds as
+                # slices so it can be cleared with one strided store instead of fillPoly
+                xs, ys = np.unique(poly[:, 0]), np.unique(poly[:, 1])
+                if len(xs) <= 2 and len(ys) <= 2:
+                    self._gap_rects[(key, orientation)] = (
+                        slice(max(int(ys[0]), 0), int(ys[-1]) + 1),
+                        slice(max(int(xs[0]), 0), int(xs[-1]) + 1)
+                    )
+
+    def _allocate_canvases(self):
+        """
+        Preallocate one pre-filled background per theme, so frames start from a
+        copy of it instead of being filled with np.full.
+        """
+        shape = (self.resolution[1], self.resolution[0], 3)
+        self._blank_light = np.empty(shape, dtype=np.uint8)
+        self._blank_light[:] = (255, 255, 255)
+        self._blank_dark = np.empty(shape, dtype=np.uint8)
+        self._blank_dark[:] = (0, 0, 0)
+
+    def _sync_resolution(self):
+        """
+        Rebuild geometry, background canvases and the frame cache if the resolution,
+        viewing distance or PPI changed after construction.
+        """
+        params = self._render_params()
+        if params != self._frame_cache_params:
+            self._frame_cache.clear()
+            self._frame_cache_params = params
+            self._precompute_geometry()
+            self._allocate_canvases()
+
     def render_landolt_c(self, acuity_key, orientation, adaptive_mode=False, dark_mode=False, hide_hud=False):
         """
         Render the Landolt C optotype on a canvas.
@@ -57,98 +253,49 @@ class VisualAcuityEngine:
         """
         if acuity_key not in self.acuity_levels:
             return None, "Invalid Acuity Level"
+
+        self._sync_resolution()
+
+        cache_key = (acuity_key, orientation, adaptive_mode, dark_mode, hide_hud)
+        cached = self._frame_cache.get(cache_key)
+        if cached is not None:
+            # cv2.imshow does not mutate the array, so the cached frame is returned as-is
+            return cached
             
-        name, arcmin = self.acuity_levels[acuity_key]
-        gap_px, height_px = self.calculate_sizes_px(arcmin)
-        
-        # Constraints check
-        warning = None
-        if height_px > min(self.resolution):
-            # Scale down proportionally if it exceeds screen
-            scale = min(self.resolution) / height_px
-            height_px = min(self.resolution)
-            gap_px = gap_px * scale
-            warning = f"Warning: {name} stimulus exceeds screen size, scaled down."
-            
-        if height_px < 2.0:
-            scale = 2.0 / height_px
-            height_px = 2.0
-            gap_px = gap_px * scale
-            warning = f"Warning: {name} stimulus size very small (calculated height {2.0 / scale:.2f}px < 2px), using minimum visible size."
+        name = self.acuity_levels[acuity_key][0]
+        geom = self._geom[acuity_key]
+        warning = geom.warning
 
         # Theme colors
         if dark_mode:
-            bg_color      = (0, 0, 0)        # Black background
             ring_color    = (255, 255, 255)  # White C
             hole_color    = (0, 0, 0)        # Black hole
             gap_color     = (0, 0, 0)        # Black gap
             text_color    = (255, 255, 255)  # White text
             hint_color    = (160, 160, 160)  # Light grey hint
         else:
-            bg_color      = (255, 255, 255)  # White background
             ring_color    = (0, 0, 0)        # Black C
             hole_color    = (255, 255, 255)  # White hole
             gap_color     = (255, 255, 255)  # White gap
             text_color    = (0, 0, 0)        # Black text
             hint_color    = (100, 100, 100)  # Dark grey hint
 
-        # Create canvas
-        canvas = np.full((self.resolution[1], self.resolution[0], 3), bg_color, dtype=np.uint8)
-        
-        # Center coordinates
-        center_x, center_y = self.resolution[0] // 2, self.resolution[1] // 2
+        # Copy of the preallocated theme background; it becomes the cached frame
+        canvas = (self._blank_dark if dark_mode else self._blank_light).copy()
         
         # Draw Landolt C (Black circle with a hole and a gap)
-        # Outer radius = height_px / 2
-        # Inner radius = (height_px - 2 * stroke) / 2 = (5g - 2g) / 2 = 3g / 2
-        outer_radius = int(round(height_px / 2))
-        inner_radius = int(round(3 * gap_px / 2))
-        stroke = int(round(gap_px))
-        
-        # Draw the ring
-        cv2.circle(canvas, (center_x, center_y), outer_radius, ring_color, -1, lineType=cv2.LINE_AA)
-        cv2.circle(canvas, (center_x, center_y), inner_radius, hole_color, -1, lineType=cv2.LINE_AA)
-        
-        # Draw the gap
-        # The gap is a rectangle of width 'stroke' and extends from center to outer edge
-        # We can draw a white rectangle over the ring
-        
-        gap_rect_width = stroke
-        gap_rect_height = outer_radius + 5 # Extra for overlap
+        # Draw the ring (crisp unless it is too thin to survive the hole)
+        line_type = cv2.LINE_8 if geom.outer_radius - geom.inner_radius >= MIN_CRISP_RING_PX else cv2.LINE_AA
+        cv2.circle(canvas, self._center, geom.outer_radius, ring_color, -1, lineType=line_type)
+        cv2.circle(canvas, self._center, geom.inner_radius, hole_color, -1, lineType=line_type)
         
-        # Define the rotation angle based on orientation
-        # 0: Right, 90: Down, 180: Left, 270: Up
-        angles = {
-            'Right': 0,
-            'Down': 90,
-            'Left': 180,
-            'Up': 270
-        }
-        angle = angles.get(orientation, 0)
-        
-        # Create a overlay with transparency for anti-aliasing if needed, 
-        # but for simplicity we use rotation matrix on a rectangle
-        
-        # Coordinates of the gap rectangle relative to center
-        # It should cover the area where the gap should be
-        pts = np.array([
-            [0, -gap_rect_width / 2],
-            [gap_rect_height, -gap_rect_width / 2],
-            [gap_rect_height, gap_rect_width / 2],
-            [0, gap_rect_width / 2]
-        ])
-        
-        # Rotate points
-        rad = math.radians(angle)
-        rot_matrix = np.array([
-            [math.cos(rad), -math.sin(rad)],
-            [math.sin(rad), math.cos(rad)]
-        ])
-        rotated_pts = pts @ rot_matrix.T
-        rotated_pts = rotated_pts + [center_x, center_y]
-        
-        # Draw the gap
-        cv2.fillPoly(canvas, [rotated_pts.astype(np.int32)], gap_color, lineType=cv2.LINE_AA)
+        # Draw the gap (unknown orientations fall back to 'Right', as before)
+        gap_key = (acuity_key, orientation) if (acuity_key, orientation) in self._gap_polys else (acuity_key, 'Right')
+        gap_rect = self._gap_rects.get(gap_key)
+        if gap_rect is not None:
+            canvas[gap_rect] = gap_color
+        else:
+            cv2.fillPoly(canvas, [self._gap_polys[gap_key]], gap_color, lineType=cv2.LINE_AA)
 
         # Top HUD labels (hidden when hide_hud=True)
         if not hide_hud:
@@ -172,6 +319,7 @@ class VisualAcuityEngine:
                         (10, self.resolution[1] - 20),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.36, hint_color, 1)
 
+        self._frame_cache[cache_key] = (canvas, warning)
         return canvas, warning
 
     def _draw_single_c(self, canvas, center, height_px, gap_px, orientation, color, bg_color):
@@ -180,11 +328,14 @@ class VisualAcuityEngine:
         outer_radius = height_px / 2.0
         inner_radius = outer_radius * 0.6
         
+        # Crisp edges unless the ring is too thin to survive the hole
+        line_type = cv2.LINE_8 if int(outer_radius) - int(inner_radius) >= MIN_CRISP_RING_PX else cv2.LINE_AA
+
         # 1. Full circle
-        cv2.circle(canvas, (cx, cy), int(outer_radius), color, -1, lineType=cv2.LINE_AA)
+        cv2.circle(canvas, (cx, cy), int(outer_radius), color, -1, lineType=line_type)
         
         # 2. Inner hole
-        cv2.circle(canvas, (cx, cy), int(inner_radius), bg_color, -1, lineType=cv2.LINE_AA)
+        cv2.circle(canvas, (cx, cy), int(inner_radius), bg_color, -1, lineType=line_type)
         
         # 3. Gap
         gap_w = gap_px
@@ -198,23 +349,13 @@ class VisualAcuityEngine:
             [0, gap_w/2]
         ])
         
-        # Rotate
-        angle = 0
-        if orientation == 'Up': angle = -90
-        elif orientation == 'Down': angle = 90
-        elif orientation == 'Left': angle = 180
-        elif orientation == 'Right': angle = 0
-            
-        theta = np.radians(angle)
-        c, s = np.cos(theta), np.sin(theta)
-        R = np.array(((c, -s), (s, c)))
-        
-        rotated_pts = pts.dot(R.T)
+        # Rotate (unknown orientations are drawn unrotated, like 'Right')
+        rotated_pts = pts.dot(CHART_GAP_ROTATIONS_T.get(orientation, CHART_GAP_ROTATIONS_T['Right']))
         rotated_pts[:, 0] += cx
         rotated_pts[:, 1] += cy
         
-        # Draw gap
-        cv2.fillPoly(canvas, [rotated_pts.astype(np.int32)], bg_color, lineType=cv2.LINE_AA)
+        # Draw gap (hard-edged alongside a crisp ring, like the single-optotype view)
+        cv2.fillPoly(canvas, [rotated_pts.astype(np.int32)], bg_color, lineType=line_type)
 
     def render_chart_mode(self, dark_mode=False, hide_hud=False):
         """Renders a multi-optotype chart with rows of decreasing size."""
@@ -223,8 +364,10 @@ class VisualAcuityEngine:
             bg_color = (0, 0, 0); text_color = (255, 255, 255); hint_color = (100, 100, 100)
         else:
             bg_color = (255, 255, 255); text_color = (0, 0, 0); hint_color = (180, 180, 180)
-            
-        canvas = np.full((self.resolution[1], self.resolution[0], 3), bg_color, dtype=np.uint8)
+
+        # Copy of the preallocated theme background (the caller keeps the returned canvas)
+        self._sync_resolution()
+        canvas = (self._blank_dark if dark_mode else self._blank_light).copy()
         
         # Define rows: (Acuity Key, Y-position, Count)
         # 6/60 (Key '4'), 6/18 ('3'), 6/12 ('2'), 6/6 ('1')
@@ -235,13 +378,12 @@ class VisualAcuityEngine:
             ('1', 460, 5)
         ]
         
-        import random
-        orientations = ['Up', 'Down', 'Left', 'Right']
-        
+        # (gap_px, height_px) for every acuity level in one vectorized call
+        all_sizes = dict(zip(self.acuity_levels, self.calculate_all_sizes_px().tolist()))
+
         for key, y_pos, count in rows:
             name = self.acuity_levels[key][0]
-            arcmin = self.acuity_levels[key][1]
-            gap_px, height_px = self.calculate_sizes_px(arcmin)
+            gap_px, height_px = all_sizes[key]
             
             # Clamp logic (same as main renderer to ensure visibility)
             if height_px < 2.0:
@@ -253,9 +395,12 @@ class VisualAcuityEngine:
             total_width = self.resolution[0]
             spacing = total_width / (count + 1)
             
+            # One batched draw of this row's orientations
+            oris = _RNG.choices(ORIENTATIONS, k=count)
+
             for i in range(count):
                 x_pos = int(spacing * (i + 1))
-                ori = random.choice(orientations)
+                ori = oris[i]
                 self._draw_single_c(canvas, (x_pos, y_pos), height_px, gap_px, ori, text_color, bg_color)
             
             # Draw row label